@@ -2,6 +2,12 @@
 
 # Imports:
 
+import argparse
+import json
+import sys
+from bisect import bisect_left
+from functools import lru_cache
+
 import numpy as np
 
 # Functions taken from "numpy_financial" package
@@ -111,16 +117,56 @@ def pmt(rate, nper, pv, fv=0, when='end'):
 
     """
     when = _convert_when(when)
-    (rate, nper, pv, fv, when) = map(np.array, [rate, nper, pv, fv, when])
+    if not any(isinstance(x, (list, tuple, np.ndarray))
+               for x in (rate, nper, pv, fv, when)):
+        # Scalar fast path, avoiding ndarray conversion and broadcasting
+        temp = (1 + rate)**nper
+        if rate == 0:
+            fact = nper
+        else:
+            fact = (1 + rate*when)*(temp - 1)/rate
+        return -(fv + pv*temp) / fact
+    (rate, nper, pv, fv, when) = (np.asarray(x)
+                                  for x in (rate, nper, pv, fv, when))
     temp = (1 + rate)**nper
     mask = (rate == 0)
     masked_rate = np.where(mask, 1, rate)
-    fact = np.where(mask != 0, nper,
+    fact = np.where(mask, nper,
                     (1 + masked_rate*when)*(temp - 1)/masked_rate)
     return -(fv + pv*temp) / fact
 
+# Constants:
+
+# CMHC premium rates, by upper loan-to-value bound of each bracket:
+INS_LTV_BOUNDS = (0.65, 0.75)
+INS_RATES = (0.006, 0.017, 0.024)
+
+# Upper loan-to-value bounds of the uninsured renewal rate brackets:
+UN_LTV_BOUNDS = (0.65, 0.70, 0.75)
+
+# Provincial sales tax on mortgage insurance premiums:
+INS_TAX_RATES = {'quebec': 0.09975,
+                 'ontario': 0.13,
+                 'saskatchewan': 0.06}
+
+# Inputs, in prompt order, with their types:
+INPUTS = (('tot', float), ('d', float), ('a', int), ('prov', str),
+          ('r_ins_init', float), ('r_un_init', float), ('r_ins', float),
+          ('r_un_80', float), ('r_un_75', float), ('r_un_70', float),
+          ('r_un_65', float), ('y', int))
+
 # Functions:
 
+@lru_cache(maxsize=16)
+def _month_rate(r):
+    """
+    r: float, annual interest rate, in percent, compounded semi-annually
+    returns: month_r (float), the equivalent monthly growth factor
+    """
+    biann_r = 1 + r/200
+    month_r = biann_r**(1/6)
+    return month_r
+
 def mortgage_payment(r, l, a):
     """
     r: float, annual interest rate, in percent
@@ -128,8 +174,7 @@ def mortgage_payment(r, l, a):
     a: int, amortization in years
     returns: p (float), the monthly mortgage payment in dollars
     """
-    biann_r = 1 + r/200
-    month_r = biann_r**(1/6)
+    month_r = _month_rate(r)
     p = -pmt(month_r - 1, a*12, l)
     return p
 
@@ -142,23 +187,21 @@ def princ_calc(y, l, r, p):
     returns: princ_paid (float), the amount of principal paid off over the
         life of the contract, in dollars
     """
-    biann_r = 1 + r/200
-    month_r = biann_r**(1/6)
-    months_remaining = y*12
-    l_remaining = l
-    princ_paid = 0
-    while months_remaining > 0:
-        princ_paid_month = p - l_remaining*(month_r - 1)
-        princ_paid += princ_paid_month
-        l_remaining -= princ_paid_month
-        months_remaining -= 1
+    month_r = _month_rate(r)
+    i = month_r - 1
+    n = y*12
+    if i == 0:
+        return n*p
+    growth = month_r**n
+    l_remaining = l*growth - p*(growth - 1)/i
+    princ_paid = l - l_remaining
     return princ_paid
 
 def cmhc_insurance(l, d, prov):
     """
     l: float, loan amount, in dollars
     d: float, down payment amount, in dollars
-    prov: string, province of purchase
+    prov: string, province of purchase, in lowercase
     returns:
         - ins (float), the CMHC mortgage insurance cost over the initial term,
             in dollars
@@ -166,56 +209,22 @@ def cmhc_insurance(l, d, prov):
             dollars
     """
     ltv = l/(l + d)
-    if ltv <= 0.65:
-        ins = 0.006*l
-    elif ltv <= 0.75:
-        ins = 0.017*l
-    else:
-        ins = 0.024*l
-    ins_tax = 0
-    prov_l = prov.lower()
-    if prov_l == 'quebec':
-        ins_tax = ins*0.09975
-    elif prov_l == 'ontario':
-        ins_tax = ins*0.13
-    elif prov_l == 'saskatchewan':
-        ins_tax = ins*0.06
+    ins = INS_RATES[bisect_left(INS_LTV_BOUNDS, ltv)]*l
+    ins_tax = ins*INS_TAX_RATES.get(prov, 0)
     return ins, ins_tax
 
-def cost_over_term(y, l, tot, insured, a, is_init):
+def cost_over_term(y, l, r, a):
     """
     y: int, the term period in years
     l: float, loan amount, in dollars
-    tot: float, purchase price, in dollars
-    ins_purchased: Boolean, True if mortgage insurance is being purchased with
-        this loan contract
-    insured: Boolean, True if the mortgage loan is insured
+    r: float, annual interest rate for this term, in percent
     a: int, amortization in years
-    is_init: Boolean, True if this is the initial term
     returns:
         - term_cost (float), the total mortgage cost over the life of the
             contract, in dollars
         - princ_paid (float), the amount of principal paid off over the life
             of the contract, in dollars
     """
-    if insured:
-        if is_init:
-            r = r_ins_init
-        else:
-            r = r_ins
-    else:
-        if is_init:
-            r = r_un_init
-        else:
-            ltv = l/tot
-            if ltv <= 0.65:
-                r = r_un_65
-            elif ltv <= 0.70:
-                r = r_un_70
-            elif ltv <= 0.75:
-                r = r_un_75
-            else:
-                r = r_un_80
     p = mortgage_payment(r, l, a)
     term_cost = y*12*p
     princ_paid = princ_calc(y, l, r, p)
@@ -239,25 +248,92 @@ def cost_over_mortgage(y, l, tot, insured, a):
         ins, ins_tax = cmhc_insurance(l, (tot - l), prov)
         l_remaining += ins
         tot_cost += ins_tax
-    term_cost, princ_paid = cost_over_term(y, l_remaining, tot, insured,
-                                           a_remaining, True)
+        r_init = r_ins_init
+        ltv_bounds = ()
+        future_rates = (r_ins,)
+    else:
+        r_init = r_un_init
+        ltv_bounds = UN_LTV_BOUNDS
+        future_rates = (r_un_65, r_un_70, r_un_75, r_un_80)
+    term_cost, princ_paid = cost_over_term(y, l_remaining, r_init, a_remaining)
     tot_cost += term_cost
     a_remaining -= y
     l_remaining -= princ_paid
     while a_remaining >= y:
-        term_cost, princ_paid = cost_over_term(y, l_remaining, tot, insured,
-                                               a_remaining, False)
+        r = future_rates[bisect_left(ltv_bounds, l_remaining/tot)]
+        term_cost, princ_paid = cost_over_term(y, l_remaining, r, a_remaining)
         tot_cost += term_cost
         a_remaining -= y
         l_remaining -= princ_paid
     tot_cost += l_remaining
     return tot_cost
 
+def read_values(values, inputs):
+    """
+    values: dict, input values keyed by name, either as strings or as values
+        parsed from JSON
+    inputs: tuple of (name, type) pairs, taken from INPUTS
+    returns: list of the values of these inputs, converted to their types
+    raises: ValueError if an input is missing or its value is invalid
+    """
+    missing = [name for name, _ in inputs if name not in values]
+    if missing:
+        raise ValueError("missing input value(s): " + ", ".join(missing))
+    converted = []
+    for name, cast in inputs:
+        value = values[name]
+        if cast is str:
+            valid = isinstance(value, str)
+        else:
+            valid = (isinstance(value, (str, int, cast))
+                     and not isinstance(value, bool))
+        try:
+            if not valid:
+                raise TypeError
+            converted.append(cast(value))
+        except (ValueError, TypeError):
+            raise ValueError("invalid value for " + name + ": "
+                             + repr(value)) from None
+    return converted
+
 # Main:
     
-tot = float(input("Please enter the purchase price ($): "))
-d = float(input("\nPlease enter the down payment ($): "))
-a = int(input("\nPlease enter the initial amortization period, in years: "))
+parser = argparse.ArgumentParser(
+    description="Compare the total cost of an insured and an uninsured "
+                "mortgage. Without options, each input is prompted for.")
+mode = parser.add_mutually_exclusive_group()
+mode.add_argument('--config', metavar='FILE',
+                  help="JSON file mapping input names (" + ", ".join(
+                      name for name, _ in INPUTS) + ") to values")
+mode.add_argument('--stdin', action='store_true',
+                  help="read the inputs from stdin, one per line, in the "
+                       "order of the prompts")
+args = parser.parse_args()
+interactive = args.config is None and not args.stdin
+
+if interactive:
+    tot = float(input("Please enter the purchase price ($): "))
+    d = float(input("\nPlease enter the down payment ($): "))
+    a = int(input("\nPlease enter the initial amortization period, in "
+                  "years: "))
+else:
+    if args.config is not None:
+        try:
+            with open(args.config) as f:
+                values = json.load(f)
+        except (OSError, ValueError) as e:
+            parser.error("cannot read config file: " + str(e))
+        if not isinstance(values, dict):
+            parser.error("config file must contain a JSON object")
+    else:
+        lines = sys.stdin.read().split('\n')
+        if lines[-1] == '':
+            lines.pop()
+        values = dict(zip((name for name, _ in INPUTS), lines))
+    try:
+        tot, d, a = read_values(values, INPUTS[:3])
+    except ValueError as e:
+        parser.error(str(e))
 if tot >= 1000000:
     print("\nThe house is not eligible for mortgage insurance since it costs",
           "$1 million or more.")
@@ -269,16 +345,25 @@ elif a > 25:
           "years.")
 else:
     l = tot - d
-    prov = input("\nProvince where property is located (omit accents): ")
-    r_ins_init = float(input("\nInitial interest rate if insured (%): "))
-    r_un_init = float(input("\nInitial interest rate if uninsured (%): "))
-    r_ins = float(input("\nEstimated future interest rate if insured (%): "))
-    print("\nEstimated future interest rate if uninsured...")
-    r_un_80 = float(input("...75-80% LTV (%): "))
-    r_un_75 = float(input("...70-75% LTV (%): "))
-    r_un_70 = float(input("...65-70% LTV (%): "))
-    r_un_65 = float(input("...0-65% LTV (%): "))
-    y = int(input("\nPlease enter the term period, in years: "))
+    if interactive:
+        prov = input("\nProvince where property is located (omit accents): ")
+        r_ins_init = float(input("\nInitial interest rate if insured (%): "))
+        r_un_init = float(input("\nInitial interest rate if uninsured (%): "))
+        r_ins = float(input("\nEstimated future interest rate if insured "
+                            "(%): "))
+        print("\nEstimated future interest rate if uninsured...")
+        r_un_80 = float(input("...75-80% LTV (%): "))
+        r_un_75 = float(input("...70-75% LTV (%): "))
+        r_un_70 = float(input("...65-70% LTV (%): "))
+        r_un_65 = float(input("...0-65% LTV (%): "))
+        y = int(input("\nPlease enter the term period, in years: "))
+    else:
+        try:
+            (prov, r_ins_init, r_un_init, r_ins, r_un_80, r_un_75, r_un_70,
+             r_un_65, y) = read_values(values, INPUTS[3:])
+        except ValueError as e:
+            parser.error(str(e))
+    prov = prov.lower()
     tot_cost_ins = cost_over_mortgage(y, l, tot, True, a)
     print("\nThe total cost of the insured mortgage is: $"
           + str(round(tot_cost_ins, 2)))